@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+
+"""Checkpoints for incrementally re-solving append-only inputs.
+
+Some inputs are append-only logs that grow between runs. A checkpoint
+stored next to the input records how many bytes have been processed and
+the running state of the solution, so the next run only reads the bytes
+appended since.
+
+Only complete, newline-terminated lines are consumed; a trailing partial
+line is left for the next run. The checkpoint also stores a hash of the
+start of the input, so a file that was rewritten rather than appended to
+is detected and solved from scratch.
+
+Large running state, such as whole sorted columns, does not belong in the
+JSON. It is kept in binary ``.npy`` sidecars next to the checkpoint, which
+are memory-mapped when loaded.
+
+Functions:
+    checkpoint_path: Returns the checkpoint file used for an input.
+    sidecar_path: Returns the path of a named array sidecar.
+    load_sidecar: Memory-maps a named array sidecar.
+    save_sidecar: Persists a named array sidecar.
+    read_appended: Loads a checkpoint and the bytes appended since it.
+    save_checkpoint: Persists the offset and state for the next run.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+
+# Number of leading bytes hashed to detect a rewritten input
+HEAD_BYTES = 4096
+
+
+def checkpoint_path(in_file):
+    """Return the path of the checkpoint stored next to ``in_file``.
+
+    Args:
+        in_file (str): Path to the input file.
+
+    Returns:
+        str: Path to the checkpoint file.
+    """
+    return f"{in_file}.checkpoint.json"
+
+
+def sidecar_path(in_file, name):
+    """Return the path of the array sidecar ``name`` stored next to ``in_file``.
+
+    Args:
+        in_file (str): Path to the input file.
+        name (str): Name of the array.
+
+    Returns:
+        str: Path to the ``.npy`` sidecar.
+    """
+    return f"{in_file}.checkpoint.{name}.npy"
+
+
+def load_sidecar(in_file, name):
+    """Memory-map the array sidecar ``name`` of an input.
+
+    Args:
+        in_file (str): Path to the input file.
+        name (str): Name of the array.
+
+    Returns:
+        np.ndarray: The read-only mapped array, or None if it is missing or
+            unreadable.
+    """
+    try:
+        return np.load(sidecar_path(in_file, name), mmap_mode="r")
+    except (OSError, ValueError):
+        return None
+
+
+def save_sidecar(in_file, name, array):
+    """Persist the array sidecar ``name`` of an input.
+
+    Like the checkpoint, the array is written to a temporary file and moved
+    into place, which also leaves any mapping of the old array intact.
+
+    Args:
+        in_file (str): Path to the input file.
+        name (str): Name of the array.
+        array (np.ndarray): The array to save.
+    """
+    path = sidecar_path(in_file, name)
+    with open(f"{path}.tmp", "wb") as file:
+        np.save(file, array)
+    os.replace(f"{path}.tmp", path)
+
+
+def _head_hash(file, offset):
+    """Hash the first ``min(offset, HEAD_BYTES)`` bytes of an open file."""
+    file.seek(0)
+    return hashlib.sha256(file.read(min(offset, HEAD_BYTES))).hexdigest()
+
+
+def read_appended(in_file, kind):
+    """Load the checkpoint for an input and the bytes appended since.
+
+    Args:
+        in_file (str): Path to the input file.
+        kind (str): Identifies the solver that wrote the checkpoint.
+
+    Returns:
+        tuple: The saved state (None if there is no usable checkpoint),
+            the newly appended complete lines as bytes, and the offset
+            just past them.
+    """
+    state, offset, head = None, 0, None
+    try:
+        with open(checkpoint_path(in_file)) as file:
+            checkpoint = json.load(file)
+        if checkpoint.get("kind") == kind:
+            state, offset, head = (
+                checkpoint["state"],
+                checkpoint["offset"],
+                checkpoint["head"],
+            )
+    except (OSError, ValueError, KeyError, AttributeError):
+        state, offset, head = None, 0, None
+
+    with open(in_file, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if state is not None and (size < offset or _head_hash(file, offset) != head):
+            # The input was truncated or rewritten, start over
+            state, offset = None, 0
+        file.seek(offset)
+        data = file.read()
+
+    # Leave any partial last line for the next run
+    data = data[: data.rfind(b"\n") + 1]
+    return state, data, offset + len(data)
+
+
+def save_checkpoint(in_file, kind, offset, state):
+    """Persist the processed offset and running state of an input.
+
+    The checkpoint is written to a temporary file and moved into place, so
+    an interrupted run never leaves a corrupt checkpoint behind.
+
+    Args:
+        in_file (str): Path to the input file.
+        kind (str): Identifies the solver writing the checkpoint.
+        offset (int): Number of bytes of the input that were processed.
+        state (dict): JSON-serializable running state of the solution.
+    """
+    with open(in_file, "rb") as file:
+        head = _head_hash(file, offset)
+
+    path = checkpoint_path(in_file)
+    with open(f"{path}.tmp", "w") as file:
+        json.dump({"kind": kind, "offset": offset, "head": head, "state": state}, file)
+    os.replace(f"{path}.tmp", path)
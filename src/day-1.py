@@ -8,11 +8,19 @@ of the challenge, with `day_one_p1` for Part 1 and `day_one_p2` for Part 2.
 """
 
 import argparse
+import os
 from collections import Counter
 
 import numpy as np
 import pandas as pd
 
+from checkpoint import checkpoint_path
+from checkpoint import load_sidecar
+from checkpoint import read_appended
+from checkpoint import save_checkpoint
+from checkpoint import save_sidecar
+from ragged import parse_ragged
+
 
 def day_one_p1(in_file):
     """Solve Part 1 of Day 1."""
@@ -34,15 +42,81 @@ def day_one_p2(in_file):
     print(f"Similarity Score: {similarity_score}")
 
 
+def count_in(sorted_values, values):
+    """Count how often each of ``values`` occurs in a sorted array."""
+    return np.searchsorted(sorted_values, values, side="right") - np.searchsorted(
+        sorted_values, values, side="left"
+    )
+
+
+def day_one_incremental(in_file):
+    """Solve both parts of Day 1 from a checkpoint plus newly appended lines.
+
+    Both columns are kept sorted in binary sidecars next to the checkpoint,
+    which itself only holds the two answers. New values are merged into the
+    sorted columns, and the similarity score is updated from the new values
+    alone, counting occurrences by binary search.
+    """
+    state, data, offset = read_appended(in_file, "day-1")
+    if state is not None:
+        left = load_sidecar(in_file, "left")
+        right = load_sidecar(in_file, "right")
+        if (
+            left is None
+            or right is None
+            or not len(left) == len(right) == state.get("rows")
+        ):
+            # The sidecars are missing or out of step, start over
+            os.remove(checkpoint_path(in_file))
+            state, data, offset = read_appended(in_file, "day-1")
+    if state is None:
+        left = right = np.zeros(0, dtype=np.int64)
+        state = {"rows": 0, "distance": 0, "similarity": 0}
+
+    values, row_offsets = parse_ragged(data)
+    if not (np.diff(row_offsets) == 2).all():
+        raise ValueError(f"{in_file}: appended rows are not all two values")
+    if len(values) > 0:
+        pairs = values.reshape(-1, 2)
+        new_left = np.sort(pairs[:, 0])
+        new_right = np.sort(pairs[:, 1])
+
+        # (L + dL) * (R + dR) = L * R + dL * (R + dR) + L * dR for every value
+        merged_right = np.insert(right, np.searchsorted(right, new_right), new_right)
+        similarity_score = state["similarity"]
+        similarity_score += int(np.sum(new_left * count_in(merged_right, new_left)))
+        similarity_score += int(np.sum(new_right * count_in(left, new_right)))
+
+        # Merge the new values into the sorted columns
+        left = np.insert(left, np.searchsorted(left, new_left), new_left)
+        right = merged_right
+        total = int(np.sum(np.abs(left - right)))
+
+        save_sidecar(in_file, "left", left)
+        save_sidecar(in_file, "right", right)
+        state = {"rows": len(left), "distance": total, "similarity": similarity_score}
+    save_checkpoint(in_file, "day-1", offset, state)
+    print(f"Total Distance: {state['distance']}")
+    print(f"Similarity Score: {state['similarity']}")
+
+
 def main():
     """Main."""
     parser = argparse.ArgumentParser(description="Load input")
     parser.add_argument(
         "input_path", type=str, help="Path to the file containing input data"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process lines appended since the last checkpointed run",
+    )
     args = parser.parse_args()
-    day_one_p1(args.input_path)
-    day_one_p2(args.input_path)
+    if args.incremental:
+        day_one_incremental(args.input_path)
+    else:
+        day_one_p1(args.input_path)
+        day_one_p2(args.input_path)
 
 
 if __name__ == "__main__":
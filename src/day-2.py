@@ -6,52 +6,52 @@ This module contains functions for solving the puzzles in Day 1 of
 the Advent of Code 2024 challenge. Each function represents a part
 of the challenge, with `day_two_p1` for Part 1 and `day_two_p2` for Part 2.
 """
+
 import argparse
 
 import numpy as np
-import pandas as pd
 
+from checkpoint import read_appended
+from checkpoint import save_checkpoint
+from ragged import parse_ragged
+from ragged import read_ragged
 
-def day_two_p1(in_file):
-    """Solve Part 1 of Day 2."""
-    # Load input Data
-    df = pd.read_csv(in_file, sep=r"\s+", header=None)
 
-    def check_levels(row):
-        """Check levels of data."""
-        # Drop NaN values
-        row = row.dropna().values
+def count_safe(values, row_offsets):
+    """Count the safe reports in CSR values and row offsets."""
+    lengths = np.diff(row_offsets)
 
-        # Calculate differences
-        diffs = np.diff(row)
+    # Calculate differences, dropping those that span two reports
+    diffs = np.diff(values)
+    report = np.repeat(np.arange(len(lengths)), np.maximum(lengths - 1, 0))
+    diffs = np.delete(diffs, row_offsets[1:-1] - 1)
 
-        # Check if all increasing or all decreasing
-        all_increasing = np.all(diffs > 0)
-        all_decreasing = np.all(diffs < 0)
+    # Count the steps in each report that are not a valid increase / decrease
+    bad_increase = np.bincount(
+        report, weights=~((diffs >= 1) & (diffs <= 3)), minlength=len(lengths)
+    )
+    bad_decrease = np.bincount(
+        report, weights=~((diffs <= -1) & (diffs >= -3)), minlength=len(lengths)
+    )
 
-        # Check if differences are between 1 and 3
-        valid_diffs = np.all((np.abs(diffs) >= 1) & (np.abs(diffs) <= 3))
-        return (all_increasing or all_decreasing) and valid_diffs
+    # Count the number of valid reports
+    return int(np.sum((bad_increase == 0) | (bad_decrease == 0)))
 
-    # Apply the function to each row
-    df["valid"] = df.apply(check_levels, axis=1)
 
-    # Count the number of valid reports
-    safe_count = df["valid"].sum()
+def day_two_p1(in_file):
+    """Solve Part 1 of Day 2."""
+    # Load input Data
+    values, row_offsets = read_ragged(in_file)
+    safe_count = count_safe(values, row_offsets)
 
     print(f"Number of safe reports: {safe_count}")
 
 
-def day_two_p2(in_file):
-    """Solve Part 2 of Day 2."""
-    # Load df
-    df = pd.read_csv(in_file, sep=r"\s+", header=None)
+def count_safe_dampened(values, row_offsets):
+    """Count the reports in CSR values and row offsets safe with the dampener."""
 
-    def check_levels(row):
+    def check_levels(row_values):
         """Function to broadcast firsts check plus return outliers."""
-        # Extract numbers only
-        row_values = row.dropna().values
-
         # Ensure at least two values exist
         if len(row_values) < 2:
             return False
@@ -68,13 +68,10 @@ def day_two_p2(in_file):
 
         return (all_increasing or all_decreasing) and valid_diffs
 
-    def check_with_dampener(row):
+    def check_with_dampener(row_values):
         """Function to remove single outliers and recheck."""
-        # Extract numbers only
-        row_values = row.dropna().values
-
         # If the row is already valid, it's safe
-        if check_levels(row):
+        if check_levels(row_values):
             return True
 
         # Check removing each level to see if it makes the row valid
@@ -83,28 +80,62 @@ def day_two_p2(in_file):
             modified_row = np.delete(row_values, i)
 
             # Check the modified row
-            if check_levels(pd.Series(modified_row)):
+            if check_levels(modified_row):
                 return True
         return False
 
-    # Step 1: Apply the dampener logic
-    df["safe"] = df.apply(check_with_dampener, axis=1)
+    # Apply the dampener logic and count the number of safe reports
+    return sum(
+        bool(check_with_dampener(values[start:stop]))
+        for start, stop in zip(row_offsets[:-1], row_offsets[1:])
+    )
+
 
-    # Step 2: Count the number of safe reports
-    safe_count = df["safe"].sum()
+def day_two_p2(in_file):
+    """Solve Part 2 of Day 2."""
+    # Load reports
+    values, row_offsets = read_ragged(in_file)
+    safe_count = count_safe_dampened(values, row_offsets)
 
     print(f"Number of safe reports: {safe_count}")
 
 
+def day_two_incremental(in_file):
+    """Solve both parts of Day 2 from a checkpoint plus newly appended lines.
+
+    Reports are independent, so only the appended reports are checked and
+    their safe counts added to the running totals in the checkpoint.
+    """
+    state, data, offset = read_appended(in_file, "day-2")
+    if state is None:
+        state = {"safe": 0, "safe_dampened": 0}
+
+    values, row_offsets = parse_ragged(data)
+    state["safe"] += count_safe(values, row_offsets)
+    state["safe_dampened"] += count_safe_dampened(values, row_offsets)
+
+    save_checkpoint(in_file, "day-2", offset, state)
+    print(f"Number of safe reports: {state['safe']}")
+    print(f"Number of safe reports: {state['safe_dampened']}")
+
+
 def main():
     """Main."""
     parser = argparse.ArgumentParser(description="Load input")
     parser.add_argument(
         "input_path", type=str, help="Path to the file containing input data"
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only process lines appended since the last checkpointed run",
+    )
     args = parser.parse_args()
-    day_two_p1(args.input_path)
-    day_two_p2(args.input_path)
+    if args.incremental:
+        day_two_incremental(args.input_path)
+    else:
+        day_two_p1(args.input_path)
+        day_two_p2(args.input_path)
 
 
 if __name__ == "__main__":
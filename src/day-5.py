@@ -8,9 +8,98 @@ of the middle index values for both valid and rearranged sequences.
 """
 
 import argparse
+import heapq
+import re
+from collections import defaultdict
 
 import numpy as np
-import pandas as pd
+
+from ragged import parse_ragged
+
+
+def load_input(in_file):
+    """Load the rules and sequences into integer arrays.
+
+    Args:
+        in_file (str): Path to the input file containing rules and sequences.
+
+    Returns:
+        tuple: A ``(n_rules, 2)`` array of ``(x, y)`` ordering rules, and the
+            sequences as CSR values and row offsets.
+    """
+    with open(in_file, "rb") as file:
+        data = file.read()
+
+    # A blank line separates the rules from the sequences
+    parts = re.split(rb"\r?\n\s*\n", data, maxsplit=1)
+    rule_values, rule_offsets = parse_ragged(parts[0], b"|")
+    if not (np.diff(rule_offsets) == 2).all():
+        raise ValueError(f"{in_file}: rules are not all two pages")
+    values, row_offsets = parse_ragged(parts[1] if len(parts) > 1 else b"", b",")
+    return rule_values.reshape(-1, 2), values, row_offsets
+
+
+def encode_sequences(values, row_offsets):
+    """Build a page position matrix for every sequence.
+
+    Pages are mapped to dense ids first, so the matrix has one column per
+    distinct page rather than per possible page number.
+
+    Args:
+        values (np.ndarray): CSR pages of every sequence.
+        row_offsets (np.ndarray): CSR row offsets of the sequences.
+
+    Returns:
+        tuple: The sorted distinct pages, and a ``(n_sequences, n_pages)``
+            matrix giving the position of each of them in each sequence
+            (``-1`` when absent).
+    """
+    pages, page_ids = np.unique(values, return_inverse=True)
+    n_sequences = len(row_offsets) - 1
+    seq_idx = np.repeat(np.arange(n_sequences), np.diff(row_offsets))
+    col_idx = np.arange(len(values)) - row_offsets[seq_idx]
+
+    positions = np.full((n_sequences, len(pages)), -1, dtype=np.int64)
+    positions[seq_idx, page_ids] = col_idx
+    return pages, positions
+
+
+def rules_checker(pages, positions, rules):
+    """Check every sequence against every rule in one pass.
+
+    Args:
+        pages (np.ndarray): Sorted distinct pages from ``encode_sequences``.
+        positions (np.ndarray): Page position matrix from ``encode_sequences``.
+        rules (np.ndarray): ``(n_rules, 2)`` array of ``(x, y)`` ordering rules.
+
+    Returns:
+        np.ndarray: Boolean vector, True where a sequence satisfies all rules.
+    """
+    # Rules naming pages absent from every sequence can never apply
+    rule_ids = np.searchsorted(pages, rules)
+    present = (rule_ids < len(pages)).all(axis=1)
+    present[present] = (pages[rule_ids[present]] == rules[present]).all(axis=1)
+    rule_ids = rule_ids[present]
+
+    x_pos = positions[:, rule_ids[:, 0]]
+    y_pos = positions[:, rule_ids[:, 1]]
+    broken = (x_pos >= 0) & (y_pos >= 0) & (x_pos >= y_pos)
+    return ~broken.any(axis=1)
+
+
+def middle_sum(values, row_offsets, selected):
+    """Sum the middle page of the selected sequences.
+
+    Args:
+        values (np.ndarray): CSR pages of every sequence.
+        row_offsets (np.ndarray): CSR row offsets of the sequences.
+        selected (np.ndarray): Boolean vector of the sequences to sum.
+
+    Returns:
+        int: The sum of the middle pages.
+    """
+    middles = row_offsets[:-1] + np.diff(row_offsets) // 2
+    return int(values[middles[selected]].sum())
 
 
 def day_five_p1(in_file):
@@ -19,153 +108,182 @@ def day_five_p1(in_file):
     Args:
         in_file (str): Path to the input file containing rules and sequences.
     """
-    rules = []
-    sequences = []
+    rules, values, row_offsets = load_input(in_file)
+    pages, positions = encode_sequences(values, row_offsets)
+    valid = rules_checker(pages, positions, rules)
 
-    with open(in_file) as file:
-        # Read rules until a blank line is encountered
-        reading_rules = True
-        for line in file:
-            stripped_line = line.strip()
-            if stripped_line == "":
-                # Blank line marks end of rules
-                reading_rules = False
-                continue
-
-            if reading_rules:
-                # Split rule by "|" and convert to integers
-                parts = stripped_line.split("|")
-                rules.append(tuple(map(int, parts)))
-            else:
-                # After the blank line, read sequences
-                sequences.append(stripped_line)
+    # Calculate the sum of the middle index for every valid sequence
+    total = middle_sum(values, row_offsets, valid)
+
+    print("Sum of middle index for valid sequences:", total)
+
+
+def successor_index(rule_set):
+    """Index the rules by their first page.
 
-    # Convert sequences to a pandas DataFrame, assuming sequences are CSV strings
-    sequences_df = pd.DataFrame([seq.split(",") for seq in sequences])
+    Args:
+        rule_set (iterable of tuple): The ``(x, y)`` ordering rules.
 
-    def rules_checker(row):
-        """Check if a sequence row satisfies the rules.
+    Returns:
+        dict: Maps each page ``x`` to the set of pages ``y`` with a rule ``x|y``.
+    """
+    successors = defaultdict(set)
+    for x, y in rule_set:
+        successors[x].add(y)
+    return successors
 
-        Args:
-            row (pd.Series): A row of the sequence DataFrame.
 
-        Returns:
-            bool: True if the row satisfies all rules, False otherwise.
-        """
-        for x, y in rules:
-            x = str(x)
-            y = str(y)
-            if x in row.values and y in row.values:
-                x_index = row[row == x].index[0]
-                y_index = row[row == y].index[0]
-                if x_index >= y_index:
-                    return False
-        return True
+def reorder_sequence(row_list, successors):
+    """Reorder a sequence so that it satisfies the rules.
 
-    sequences_df["valid"] = sequences_df.apply(rules_checker, axis=1)
+    Pages are topologically sorted (Kahn's algorithm) over the rules whose
+    pages both appear in the sequence. Among pages with no pending
+    predecessor, the one earliest in the original sequence goes first, and
+    a repeated page keeps every occurrence.
 
-    # Calculate the sum of the middle index for every valid sequence
-    valid_sequences = sequences_df[sequences_df["valid"]].drop(columns=["valid"]).copy()
-    middle_sum = 0
-    for _, row in valid_sequences.iterrows():
-        row = np.array(row.dropna())
-        mid_row = len(row) // 2
-        middle_value = row[mid_row]
-        middle_sum += int(middle_value)
+    Raises:
+        ValueError: If the rules between the pages form a cycle.
+
+    Args:
+        row_list (list of int): The pages of the sequence.
+        successors (dict): Rule index from ``successor_index``.
+
+    Returns:
+        list of int: The pages reordered to satisfy the rules.
+    """
+    index = defaultdict(list)
+    for i, page in enumerate(row_list):
+        index[page].append(i)
+    pages = index.keys()
+
+    edges = [[] for _ in row_list]
+    in_degree = [0] * len(row_list)
+    for x in pages:
+        for y in successors.get(x, set()) & pages:
+            for i in index[x]:
+                edges[i].extend(index[y])
+            for j in index[y]:
+                in_degree[j] += len(index[x])
+
+    ready = [i for i, degree in enumerate(in_degree) if degree == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        i = heapq.heappop(ready)
+        order.append(row_list[i])
+        for j in edges[i]:
+            in_degree[j] -= 1
+            if in_degree[j] == 0:
+                heapq.heappush(ready, j)
+
+    if len(order) != len(row_list):
+        raise ValueError(f"rules form a cycle between pages of {row_list}")
+    return order
+
+
+def day_five_p2(in_file):
+    """Solve part 2 by rearranging invalid sequences and summing middle values.
+
+    Args:
+        in_file (str): Path to the input file containing rules and sequences.
+    """
+    rules, values, row_offsets = load_input(in_file)
+    successors = successor_index(map(tuple, rules.tolist()))
+
+    pages, positions = encode_sequences(values, row_offsets)
+    valid = rules_checker(pages, positions, rules)
+
+    # Rearrange the invalid sequences to create valid sequences
+    total = 0
+    for i in np.flatnonzero(~valid):
+        row = values[row_offsets[i] : row_offsets[i + 1]].tolist()
+        row_list = reorder_sequence(row, successors)
+        total += row_list[len(row_list) // 2]
+
+    print("Sum of middle index for rearranged sequences:", total)
 
-    print("Sum of middle index for valid sequences:", middle_sum)
 
+def parse_rules(lines):
+    """Parse ordering rules into a rule index.
 
-def rules_checker(row, rules):
-    """Check if a sequence row satisfies the rules.
+    Consumes lines up to and including the blank line separating the rules
+    from the sequences, leaving the iterator positioned at the sequences.
 
     Args:
-        row (pd.Series): A row of the sequence DataFrame.
+        lines (iterator of str): Lines of the input file.
 
     Returns:
-        bool: True if the row satisfies all rules, False otherwise.
+        set of tuple: Set of ``(x, y)`` ordering rules.
     """
-    for x, y in rules:
-        x = str(x)
-        y = str(y)
-        if x in row.values and y in row.values:
-            x_index = row[row == x].index[0]
-            y_index = row[row == y].index[0]
-            if x_index >= y_index:
+    rule_set = set()
+    for line in lines:
+        stripped_line = line.strip()
+        if stripped_line == "":
+            # Blank line marks end of rules
+            break
+        parts = stripped_line.split("|")
+        if len(parts) != 2:
+            raise ValueError(f"rule is not two pages: {stripped_line!r}")
+        rule_set.add(tuple(map(int, parts)))
+    return rule_set
+
+
+def stream_sequences(lines):
+    """Yield sequences one at a time as lists of pages.
+
+    Args:
+        lines (iterator of str): Remaining lines of the input file.
+
+    Yields:
+        list of int: The pages of the next sequence.
+    """
+    for line in lines:
+        stripped_line = line.strip()
+        if stripped_line:
+            yield list(map(int, stripped_line.split(",")))
+
+
+def sequence_is_valid(row_list, rule_set):
+    """Check if a single sequence satisfies the rules.
+
+    Args:
+        row_list (list of int): The pages of the sequence.
+        rule_set (set of tuple): Set of ``(x, y)`` ordering rules.
+
+    Returns:
+        bool: True if no later page is required to come before an earlier one.
+    """
+    for i, x in enumerate(row_list):
+        for y in row_list[i + 1 :]:
+            if (y, x) in rule_set:
                 return False
     return True
 
 
-def day_five_p2(in_file):
-    """Solve part 2 by rearranging invalid sequences and summing middle values.
+def day_five_stream(in_file):
+    """Solve both parts in a single streaming pass over the input.
+
+    Only the rule index is held in memory; sequences are classified and,
+    when invalid, reordered as they are read.
 
     Args:
         in_file (str): Path to the input file containing rules and sequences.
     """
-    rules = []
-    sequences = []
+    valid_sum = 0
+    rearranged_sum = 0
 
     with open(in_file) as file:
-        # Read rules until a blank line is encountered
-        reading_rules = True
-        for line in file:
-            stripped_line = line.strip()
-            if stripped_line == "":
-                # Blank line marks end of rules
-                reading_rules = False
-                continue
-
-            if reading_rules:
-                # Split rule by "|" and convert to integers
-                parts = stripped_line.split("|")
-                rules.append(tuple(map(int, parts)))
+        rule_set = parse_rules(file)
+        successors = successor_index(rule_set)
+        for row_list in stream_sequences(file):
+            middle = len(row_list) // 2
+            if sequence_is_valid(row_list, rule_set):
+                valid_sum += row_list[middle]
             else:
-                # After the blank line, read sequences
-                sequences.append(stripped_line)
-
-    # Convert sequences to a pandas DataFrame, assuming sequences are CSV strings
-    sequences_df = pd.DataFrame([seq.split(",") for seq in sequences])
-    sequences_df["valid"] = sequences_df.apply(
-        lambda row: rules_checker(row, rules), axis=1
-    )
-
-    # Extract the invalid sequences
-    invalid_sequences = (
-        sequences_df[~sequences_df["valid"]].drop(columns=["valid"]).copy()
-    )
+                rearranged_sum += reorder_sequence(row_list, successors)[middle]
 
-    # Rearrange the columns in invalid sequences to create a valid sequence
-    rearranged_sequences = []
-    for _, row in invalid_sequences.iterrows():
-        row = row.dropna()
-        # Heuristic approach to rearrange row based on rules
-        row_list = row.tolist()
-        changed = True
-        while changed:
-            changed = False
-            for x, y in rules:
-                x = str(x)
-                y = str(y)
-                if x in row_list and y in row_list:
-                    x_index = row_list.index(x)
-                    y_index = row_list.index(y)
-                    if x_index > y_index:
-                        # Swap x and y to satisfy the rule
-                        row_list[x_index], row_list[y_index] = (
-                            row_list[y_index],
-                            row_list[x_index],
-                        )
-                        changed = True
-        rearranged_sequences.append(row_list)
-
-    middle_sum = 0
-    for row_list in rearranged_sequences:
-        row = np.array([val for val in row_list if val is not None])
-        mid_row = len(row) // 2
-        middle_value = row[mid_row]
-        middle_sum += int(middle_value)
-
-    print("Sum of middle index for rearranged sequences:", middle_sum)
+    print("Sum of middle index for valid sequences:", valid_sum)
+    print("Sum of middle index for rearranged sequences:", rearranged_sum)
 
 
 def main():
@@ -174,9 +292,17 @@ def main():
     parser.add_argument(
         "input_path", type=str, help="Path to the file containing input data"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Solve both parts in one pass without loading every sequence",
+    )
     args = parser.parse_args()
-    day_five_p1(args.input_path)
-    day_five_p2(args.input_path)
+    if args.stream:
+        day_five_stream(args.input_path)
+    else:
+        day_five_p1(args.input_path)
+        day_five_p2(args.input_path)
 
 
 if __name__ == "__main__":
@@ -6,68 +6,284 @@ This module contains the solution for Day 6, which simulates the guard's path
 through a labyrinth and identifies loop-inducing positions.
 
 Functions:
+    load_lab: Loads the labyrinth and finds the guard.
+    build_jump_table: Precomputes where the guard stops in each direction.
+    GuardBuffers: Reusable turn-state buffers for repeated simulations.
     simulate_guard: Simulates the guard's movement and detects loops or exits.
+    first_entry_states: Finds the state before the guard first enters each cell.
+    test_candidates: Tests which candidate obstacles cause loops.
+    LoopPaths: Maps loop-causing obstacles to paths rebuilt on demand.
+    test_candidates_parallel: Tests candidate obstacles across processes.
     day_six_p1: Solves part 1 by counting visited positions.
     day_six_p2: Solves part 2 by identifying loop-inducing positions.
     plot_positions: Visualizes visited positions.
     plot_loops: Visualizes loop scenarios caused by obstacles.
+    render_positions: Renders visited positions headlessly to a PNG file.
+    render_loops: Renders every loop headlessly onto paginated PNG files.
 """
 
 import argparse
+import math
+import mmap
+from array import array
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from pathlib import Path
 
 import matplotlib.pyplot as plt
+import numpy as np
+from PIL import Image
 
 
-def simulate_guard(lab, start_r, start_c, start_dir):
+def build_jump_table(lab):
+    """Precompute where the guard stops when walking in each direction.
+
+    Args:
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+
+    Returns:
+        list of array: For each direction, an ``array('i')`` indexed by
+            ``r * cols + c`` holding the flat index of the last open cell
+            before the next obstacle, or -1 if the guard would leave the map.
+    """
+    rows, cols = lab.shape
+    row_ids = np.broadcast_to(np.arange(rows, dtype=np.intc)[:, None], lab.shape)
+    col_ids = np.broadcast_to(np.arange(cols, dtype=np.intc), lab.shape)
+
+    # Row or column of the nearest obstacle behind each cell in each direction
+    up = np.maximum.accumulate(np.where(lab, row_ids, -1), axis=0)
+    down = np.minimum.accumulate(np.where(lab, row_ids, rows)[::-1], axis=0)[::-1]
+    left = np.maximum.accumulate(np.where(lab, col_ids, -1), axis=1)
+    right = np.minimum.accumulate(np.where(lab, col_ids, cols)[:, ::-1], axis=1)
+    right = right[:, ::-1]
+
+    stops = (
+        np.where(up >= 0, (up + 1) * cols + col_ids, -1),
+        np.where(right < cols, row_ids * cols + right - 1, -1),
+        np.where(down < rows, (down - 1) * cols + col_ids, -1),
+        np.where(left >= 0, row_ids * cols + left + 1, -1),
+    )
+
+    jump_table = []
+    for stop in stops:
+        table = array("i")
+        table.frombytes(np.where(lab, -1, stop).astype(np.intc).tobytes())
+        jump_table.append(table)
+    return jump_table
+
+
+class GuardBuffers:
+    """Reusable turn-state buffers for repeated guard simulations.
+
+    Each cell holds a 4-bit mask of the directions the guard has turned in
+    there, stamped with the epoch of the run that wrote it. Starting a new
+    run bumps the epoch, which invalidates every mask without clearing them.
+    """
+
+    def __init__(self, cells):
+        """Allocate buffers for a labyrinth with ``cells`` cells."""
+        self.masks = bytearray(cells)
+        self.stamps = array("I", bytes(4 * cells))
+        self.epoch = 0
+
+    def next_epoch(self):
+        """Start a new run and return its epoch."""
+        if self.epoch == 0xFFFFFFFF:
+            self.stamps = array("I", bytes(4 * len(self.masks)))
+            self.epoch = 0
+        self.epoch += 1
+        return self.epoch
+
+
+def simulate_guard(
+    lab,
+    start_r,
+    start_c,
+    start_dir,
+    jump_table=None,
+    obstacle=None,
+    record_path=True,
+    buffers=None,
+):
     """Simulate the guard's movement through the labyrinth.
 
+    The guard jumps straight from turn to turn using ``jump_table``, so loop
+    detection costs O(number of turns) rather than O(path length). Cells are
+    identified by their flat index ``r * cols + c``.
+
     Args:
-        lab (list of list of str): The labyrinth represented as a grid.
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
         start_r (int): Starting row of the guard.
         start_c (int): Starting column of the guard.
         start_dir (int): Initial direction of the guard
                     (0: up, 1: right, 2: down, 3: left).
+        jump_table (list of array): Table from ``build_jump_table``,
+                    built on demand if not given.
+        obstacle (tuple): Optional extra obstacle ``(r, c)`` that is not
+                    part of ``lab``.
+        record_path (bool): Whether to fill in the visited cells and path.
+        buffers (GuardBuffers): Turn-state buffers to reuse across runs.
 
     Returns:
-        tuple: A set of visited positions, a boolean
+        tuple: A bytearray bitmap of visited cells, a boolean
                 indicating if the guard left the map,
-                and the path taken by the guard.
+                and the path taken by the guard as an
+                ``array('I')`` of cells. The visited cells and
+                path are None when ``record_path`` is False.
     """
     directions = [(-1, 0), (0, 1), (1, 0), (0, -1)]
-    rows = len(lab)
-    cols = len(lab[0]) if rows > 0 else 0
+    rows, cols = lab.shape
+    if jump_table is None:
+        jump_table = build_jump_table(lab)
+    if buffers is None:
+        buffers = GuardBuffers(rows * cols)
+
+    epoch = buffers.next_epoch()
+    masks, stamps = buffers.masks, buffers.stamps
 
-    visited_positions = set()
-    visited_states = set()  # (r, c, d)
-    path = []
+    visited_positions = bytearray(rows * cols) if record_path else None
+    path = array("I") if record_path else None
 
     r, c, d = start_r, start_c, start_dir
-    visited_positions.add((r, c))
-    visited_states.add((r, c, d))
-    path.append((r, c))
+    idx = r * cols + c
+    if record_path:
+        visited_positions[idx] = 1
+        path.append(idx)
 
     while True:
         dr, dc = directions[d]
-        nr, nc = r + dr, c + dc
+        step = dr * cols + dc
+        stop = jump_table[d][idx]
 
-        # Check bounds
-        if not (0 <= nr < rows and 0 <= nc < cols):
+        # Number of steps to the stop cell, or to the edge of the map
+        if stop == -1:
+            edges = (r, cols - 1 - c, rows - 1 - r, c)
+            steps = edges[d]
+        else:
+            steps = abs(stop - idx) // abs(step)
+
+        # The extra obstacle cuts the run short if it lies ahead of the guard
+        if obstacle is not None:
+            k = (obstacle[0] - r) * dr + (obstacle[1] - c) * dc
+            if 0 < k <= steps and (r + k * dr, c + k * dc) == obstacle:
+                steps = k - 1
+                stop = idx + steps * step
+
+        if record_path:
+            cells = range(idx + step, idx + (steps + 1) * step, step)
+            path.extend(cells)
+            for cell in cells:
+                visited_positions[cell] = 1
+
+        if stop == -1:
             # Guard leaves map
             return visited_positions, True, path
 
-        if lab[nr][nc] == "#":
-            # Turn right
-            d = (d + 1) % 4
+        r, c = r + steps * dr, c + steps * dc
+        idx += steps * step
+
+        bit = 1 << d
+        if stamps[idx] != epoch:
+            stamps[idx] = epoch
+            masks[idx] = bit
+        elif masks[idx] & bit:
+            # Loop detected
+            return visited_positions, False, path
+        else:
+            masks[idx] |= bit
+
+        # Turn right
+        d = (d + 1) % 4
+
+
+def first_entry_states(path, cols):
+    """Find the state from which the guard first enters each cell.
+
+    Args:
+        path (array): Cells visited by the guard from its start.
+        cols (int): Number of columns in the labyrinth.
+
+    Returns:
+        dict: Maps each ``(r, c)`` after the start to the ``(r, c, d)``
+            state the guard was in just before first stepping onto it.
+    """
+    # Horizontal steps first so a single column maps +-1 to vertical moves
+    step_directions = {1: 1, -1: 3, -cols: 0, cols: 2}
+    seen = bytearray(max(path, default=0) + 1)
+    if path:
+        seen[path[0]] = 1
+    entries = {}
+    for i in range(1, len(path)):
+        cell = path[i]
+        if seen[cell]:
+            continue
+        seen[cell] = 1
+        prev = path[i - 1]
+        pr, pc = divmod(prev, cols)
+        entries[divmod(cell, cols)] = (pr, pc, step_directions[cell - prev])
+    return entries
+
+
+def load_lab(in_file):
+    """Load the labyrinth and find the guard.
+
+    The file is memory-mapped and viewed as a fixed-stride byte grid, so
+    no Python object is created per cell.
+
+    Args:
+        in_file (str): Path to the input file containing the labyrinth.
+
+    Returns:
+        tuple: A boolean ``(rows, cols)`` grid of obstacles, and the
+            guard's starting ``(r, c, d)`` state.
+    """
+    with open(in_file, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as buffer:
+        # Every row has the same width, followed by its line ending
+        stride = buffer.find(b"\n") + 1
+        if stride == 0:
+            stride = len(buffer) + 1
+        cols = stride - 1
+        if cols > 0 and buffer[cols - 1] == ord("\r"):
+            cols -= 1
+
+        ending = np.frombuffer(buffer[cols:stride] or b"\n", dtype=np.uint8)
+
+        # Drop trailing blank lines, keeping the last row's line ending
+        end = len(buffer)
+        while end > 0 and buffer[end - 1] in b"\r\n":
+            end -= 1
+        size = end + len(ending)
+        if size % stride:
+            raise ValueError(f"{in_file}: rows are not all {cols} wide")
+        flat = np.frombuffer(buffer, dtype=np.uint8)
+        if size <= len(flat) and np.array_equal(flat[end:size], ending):
+            flat = flat[:size]
         else:
-            # Move forward
-            r, c = nr, nc
-            visited_positions.add((r, c))
-            path.append((r, c))
-            state = (r, c, d)
-            if state in visited_states:
-                # Loop detected
-                return visited_positions, False, path
-            visited_states.add(state)
+            # Add the line ending the last row is missing
+            flat = np.concatenate([flat[:end], ending])
+        grid = flat.reshape(-1, stride)
+        aligned = np.array_equal(
+            grid[:, cols:], np.broadcast_to(ending, (len(grid), len(ending)))
+        )
+        grid = grid[:, :cols]
+        lab = grid == ord("#")
+
+        # Find guard start, copying out of the map so it can be closed
+        guard = np.flatnonzero(np.isin(grid, np.frombuffer(b"^>v<", np.uint8)))
+        marks = grid[guard // cols, guard % cols]
+        del flat, grid, ending
+
+    if not aligned:
+        raise ValueError(f"{in_file}: rows are not all {cols} wide")
+    if guard.size == 0:
+        raise ValueError(f"{in_file}: no guard found")
+    guard_row, guard_col = divmod(int(guard[0]), cols)
+    guard_dir = b"^>v<".index(marks[0])
+
+    return lab, (guard_row, guard_col, guard_dir)
 
 
 def day_six_p1(in_file):
@@ -77,89 +293,208 @@ def day_six_p1(in_file):
         in_file (str): Path to the input file containing the labyrinth.
 
     Returns:
-        tuple: A set of visited positions and the dimensions
-            of the labyrinth (rows, cols).
-    """
-    with open(in_file) as file:
-        lab = [list(line.strip("\n")) for line in file]
-
-    rows = len(lab)
-    cols = len(lab[0]) if rows > 0 else 0
-    direction_map = {"^": 0, ">": 1, "v": 2, "<": 3}
-    guard_row, guard_col, guard_dir = None, None, None
-
-    # Find guard start
-    for r in range(rows):
-        for c in range(cols):
-            if lab[r][c] in direction_map:
-                guard_row, guard_col = r, c
-                guard_dir = direction_map[lab[r][c]]
-                lab[r][c] = "."
-                break
-        if guard_row is not None:
-            break
+        tuple: A bitmap of visited positions, the dimensions
+            of the labyrinth (rows, cols) and the labyrinth itself.
+    """
+    lab, (guard_row, guard_col, guard_dir) = load_lab(in_file)
+    rows, cols = lab.shape
 
     visited_positions, left_map, path = simulate_guard(
         lab, guard_row, guard_col, guard_dir
     )
-    return visited_positions, (rows, cols)
+    return visited_positions, (rows, cols), lab
+
+
+def test_candidates(lab, jump_table, candidates):
+    """Test which candidate obstacles trap the guard in a loop.
+
+    Args:
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+        jump_table (list of array): Table from ``build_jump_table``.
+        candidates (list of tuple): Pairs of an obstacle ``(r, c)`` and the
+            ``(r, c, d)`` state to resume the guard from.
+
+    Returns:
+        list of tuple: The loop-causing obstacles.
+    """
+    rows, cols = lab.shape
+    buffers = GuardBuffers(rows * cols)
+
+    loops = []
+    for obstacle, (r, c, d) in candidates:
+        _, left_map, _ = simulate_guard(
+            lab,
+            r,
+            c,
+            d,
+            jump_table,
+            obstacle=obstacle,
+            record_path=False,
+            buffers=buffers,
+        )
+        if not left_map:
+            loops.append(obstacle)
+    return loops
+
+
+class LoopPaths(Mapping):
+    """Loop-causing obstacles mapped lazily to the guard's path.
+
+    Only the obstacle coordinates are kept; looking up an obstacle
+    re-simulates the guard from its start to reconstruct the loop path.
+    """
+
+    def __init__(self, lab, guard, jump_table, obstacles):
+        """Store what is needed to re-simulate each loop.
+
+        Args:
+            lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+            guard (tuple): The guard's starting ``(r, c, d)`` state.
+            jump_table (list of array): Table from ``build_jump_table``.
+            obstacles (list of tuple): The loop-causing obstacles.
+        """
+        self.lab = lab
+        self.guard = guard
+        self.jump_table = jump_table
+        self.obstacles = set(obstacles)
+
+    def __getitem__(self, obstacle):
+        """Reconstruct the path of the loop caused by ``obstacle``."""
+        if obstacle not in self.obstacles:
+            raise KeyError(obstacle)
+        _, _, path = simulate_guard(self.lab, *self.guard, self.jump_table, obstacle)
+        return path
+
+    def __iter__(self):
+        """Iterate over the loop-causing obstacles."""
+        return iter(self.obstacles)
+
+    def __len__(self):
+        """Return the number of loop-causing obstacles."""
+        return len(self.obstacles)
+
+
+_worker_lab = None
+_worker_jump_table = None
+
+
+def _init_worker(shm_name, rows, cols):
+    """Load the shared grid and jump table in a worker process.
 
+    Args:
+        shm_name (str): Name of the shared memory block holding the grid,
+            followed by the four directions of the jump table.
+        rows (int): Number of rows in the labyrinth.
+        cols (int): Number of columns in the labyrinth.
+    """
+    global _worker_lab, _worker_jump_table
+    cells = rows * cols
+    shm = shared_memory.SharedMemory(name=shm_name)
+    shared = np.ndarray((rows, cols), dtype=bool, buffer=shm.buf)
+    _worker_lab = shared.copy()
+    del shared
+    _worker_jump_table = []
+    for d in range(4):
+        table = array("i")
+        start = cells + d * cells * table.itemsize
+        table.frombytes(shm.buf[start : start + cells * table.itemsize])
+        _worker_jump_table.append(table)
+    shm.close()
+
+
+def _test_candidates_worker(candidates):
+    """Test a shard of candidates against the worker's shared grid."""
+    return test_candidates(_worker_lab, _worker_jump_table, candidates)
+
+
+def test_candidates_parallel(lab, jump_table, candidates, workers):
+    """Test candidate obstacles across a pool of processes.
 
-def day_six_p2(in_file):
+    The grid and jump table are handed to the workers once through shared
+    memory and the candidates are split into one shard per worker.
+
+    Args:
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+        jump_table (list of array): Table from ``build_jump_table``.
+        candidates (list of tuple): Candidates as for ``test_candidates``.
+        workers (int): Number of worker processes.
+
+    Returns:
+        list of tuple: The merged results of ``test_candidates``.
+    """
+    rows, cols = lab.shape
+    data = lab.tobytes() + b"".join(table.tobytes() for table in jump_table)
+
+    shm = shared_memory.SharedMemory(create=True, size=max(len(data), 1))
+    try:
+        shm.buf[: len(data)] = data
+        del data
+        shards = [candidates[i::workers] for i in range(workers)]
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(shm.name, rows, cols),
+        ) as pool:
+            results = pool.map(_test_candidates_worker, shards)
+            loops = [loop for shard in results for loop in shard]
+    finally:
+        shm.close()
+        shm.unlink()
+    return loops
+
+
+def day_six_p2(in_file, workers=1):
     """Solve part 2 by identifying loop-inducing positions.
 
     Args:
         in_file (str): Path to the input file containing the labyrinth.
+        workers (int): Number of processes used to test candidate obstacles.
 
     Returns:
-        tuple: A set of visited positions, a dictionary of
-                loop-causing positions to their paths,
-                and the dimensions of the labyrinth (rows, cols).
-    """
-    with open(in_file) as file:
-        lab = [list(line.strip("\n")) for line in file]
-
-    rows = len(lab)
-    cols = len(lab[0]) if rows > 0 else 0
-    direction_map = {"^": 0, ">": 1, "v": 2, "<": 3}
-    guard_row, guard_col, guard_dir = None, None, None
-
-    # Find guard start
-    for r in range(rows):
-        for c in range(cols):
-            if lab[r][c] in direction_map:
-                guard_row, guard_col = r, c
-                guard_dir = direction_map[lab[r][c]]
-                lab[r][c] = "."
-                break
-        if guard_row is not None:
-            break
-
-    visited_positions, _, _ = simulate_guard(lab, guard_row, guard_col, guard_dir)
-    test_positions = visited_positions - {(guard_row, guard_col)}
-
-    loop_positions = {}
-    for rr, cc in test_positions:
-        if lab[rr][cc] == ".":
-            lab[rr][cc] = "#"
-            _, left_map, path = simulate_guard(lab, guard_row, guard_col, guard_dir)
-            if not left_map:
-                loop_positions[(rr, cc)] = path
-            lab[rr][cc] = "."
-
-    return visited_positions, loop_positions, (rows, cols)
+        tuple: A bitmap of visited positions, a ``LoopPaths``
+                mapping of loop-causing positions to their paths,
+                the dimensions of the labyrinth (rows, cols) and the
+                labyrinth itself.
+    """
+    lab, (guard_row, guard_col, guard_dir) = load_lab(in_file)
+    rows, cols = lab.shape
+
+    jump_table = build_jump_table(lab)
+    visited_positions, _, path = simulate_guard(
+        lab, guard_row, guard_col, guard_dir, jump_table
+    )
+
+    # The path up to the first entry is unaffected by the obstacle,
+    # so each candidate resumes from the cell just before it
+    entries = first_entry_states(path, cols)
+    candidates = [
+        (obstacle, (pr, pc, pd))
+        for obstacle, (pr, pc, pd) in entries.items()
+        if not lab[obstacle]
+    ]
+
+    if workers > 1:
+        loops = test_candidates_parallel(lab, jump_table, candidates, workers)
+    else:
+        loops = test_candidates(lab, jump_table, candidates)
+
+    loop_positions = LoopPaths(
+        lab, (guard_row, guard_col, guard_dir), jump_table, loops
+    )
+
+    return visited_positions, loop_positions, (rows, cols), lab
 
 
 def plot_positions(visited_positions, rows, cols):
     """Plot the guard's visited positions in the labyrinth.
 
     Args:
-        visited_positions (set of tuple): Set positions visited by the guard.
+        visited_positions (bytearray): Bitmap of cells visited by the guard.
         rows (int): Number of rows in the labyrinth.
         cols (int): Number of columns in the labyrinth.
     """
-    xs_visited = [c for (r, c) in visited_positions]
-    ys_visited = [r for (r, c) in visited_positions]
+    visited = np.flatnonzero(np.frombuffer(visited_positions, dtype=np.uint8))
+    ys_visited, xs_visited = np.divmod(visited, cols)
 
     plt.figure(figsize=(8, 8))
     plt.scatter(xs_visited, ys_visited, marker="s", s=40, c="blue", label="Visited")
@@ -182,8 +517,7 @@ def plot_loops(loop_positions, rows, cols):
     """
     for obstacle, path in loop_positions.items():
         plt.figure(figsize=(8, 8))
-        xs = [c for (r, c) in path]
-        ys = [r for (r, c) in path]
+        ys, xs = np.divmod(np.frombuffer(path, dtype=np.uint32), cols)
         plt.scatter(xs, ys, marker="s", s=40, c="blue", label="Loop Path")
         plt.scatter(
             [obstacle[1]], [obstacle[0]], marker="X", s=100, c="red", label="Obstacle"
@@ -197,6 +531,115 @@ def plot_loops(loop_positions, rows, cols):
         plt.show()
 
 
+# Palette indices used when rasterizing the labyrinth
+FLOOR, WALL, PATH, OBSTACLE, BORDER = range(5)
+PALETTE = np.array(
+    [
+        [255, 255, 255],  # Floor
+        [64, 64, 64],  # Wall
+        [31, 119, 180],  # Path
+        [214, 39, 40],  # Obstacle
+        [200, 200, 200],  # Border between tiles
+    ],
+    dtype=np.uint8,
+)
+
+
+def rasterize_lab(lab):
+    """Rasterize the labyrinth's walls into a grid of palette indices.
+
+    Args:
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+
+    Returns:
+        np.ndarray: A ``(rows, cols)`` array of ``FLOOR`` and ``WALL``.
+    """
+    return np.where(lab, WALL, FLOOR).astype(np.uint8)
+
+
+def save_image(image, output, scale=1):
+    """Write a grid of palette indices to a PNG file.
+
+    Args:
+        image (np.ndarray): Array of palette indices.
+        output (str): Path of the PNG file to write.
+        scale (int): Number of pixels per cell along each axis.
+    """
+    image = image.repeat(scale, axis=0).repeat(scale, axis=1)
+    # Paletted PNGs are a fraction of the size of RGB ones and encode faster
+    png = Image.fromarray(image)
+    png.putpalette(PALETTE.tobytes())
+    png.save(output)
+
+
+def render_positions(lab, visited_positions, output, scale=4):
+    """Render the guard's visited positions to a PNG file.
+
+    Args:
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+        visited_positions (bytearray): Bitmap of cells visited by the guard.
+        output (str): Path of the PNG file to write.
+        scale (int): Number of pixels per cell along each axis.
+    """
+    image = rasterize_lab(lab)
+    visited = np.frombuffer(visited_positions, dtype=np.uint8).astype(bool)
+    image.flat[visited] = PATH
+    save_image(image, output, scale)
+
+
+def render_loops(lab, loop_positions, output, per_page=64, scale=2):
+    """Render every loop as small multiples on paginated PNG files.
+
+    Each loop becomes one tile showing the walls, the loop path and the
+    obstacle that caused it. Tiles are laid out in a square grid with
+    ``per_page`` tiles per file. When there is more than one page the
+    page number is added to the file name, e.g. ``loops-001.png``.
+
+    Args:
+        lab (np.ndarray): Boolean ``(rows, cols)`` grid of obstacles.
+        loop_positions (Mapping): Obstacles mapped to their loop paths.
+        output (str): Path of the PNG file to write.
+        per_page (int): Maximum number of tiles per page.
+        scale (int): Number of pixels per cell along each axis.
+
+    Returns:
+        list of str: Paths of the files written.
+    """
+    base = rasterize_lab(lab)
+    rows, cols = base.shape
+    obstacles = sorted(loop_positions)
+    across = math.ceil(math.sqrt(per_page))
+    pages = max(math.ceil(len(obstacles) / per_page), 1)
+    output = Path(output)
+
+    written = []
+    for page_number in range(pages):
+        page_obstacles = obstacles[
+            page_number * per_page : (page_number + 1) * per_page
+        ]
+        down = max(math.ceil(len(page_obstacles) / across), 1)
+        page = np.full(
+            (down * (rows + 1) + 1, across * (cols + 1) + 1), BORDER, dtype=np.uint8
+        )
+        for n, obstacle in enumerate(page_obstacles):
+            tile = base.copy()
+            tile.flat[np.frombuffer(loop_positions[obstacle], dtype=np.uint32)] = PATH
+            tile[obstacle] = OBSTACLE
+            top = 1 + (n // across) * (rows + 1)
+            left = 1 + (n % across) * (cols + 1)
+            page[top : top + rows, left : left + cols] = tile
+
+        if pages == 1:
+            page_file = output
+        else:
+            page_file = output.with_name(
+                f"{output.stem}-{page_number + 1:03d}{output.suffix}"
+            )
+        save_image(page, page_file, scale)
+        written.append(str(page_file))
+    return written
+
+
 def main():
     """Main function to parse arguments and execute solutions."""
     parser = argparse.ArgumentParser(description="Load input")
@@ -206,20 +649,45 @@ def main():
     parser.add_argument(
         "--part", type=int, default=1, help="Puzzle part: 1 or 2 (default=1)"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Processes used to test obstacles in part 2 (default=1)",
+    )
     parser.add_argument(
         "--display", action="store_true", help="Display a plot of the results"
     )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Render the results headlessly to this PNG file instead",
+    )
     args = parser.parse_args()
 
+    if args.output:
+        # Render without a display
+        plt.switch_backend("Agg")
+
     if args.part == 1:
-        visited_positions, (rows, cols) = day_six_p1(args.input_path)
-        print(len(visited_positions))
-        if args.display:
+        visited_positions, (rows, cols), lab = day_six_p1(args.input_path)
+        print(visited_positions.count(1))
+        if args.output:
+            render_positions(lab, visited_positions, args.output)
+        elif args.display:
             plot_positions(visited_positions, rows, cols)
     else:
-        visited_positions, loop_positions, (rows, cols) = day_six_p2(args.input_path)
+        visited_positions, loop_positions, (rows, cols), lab = day_six_p2(
+            args.input_path, args.workers
+        )
         print(len(loop_positions))
-        if args.display:
+        if args.output:
+            if len(loop_positions) == 0:
+                render_positions(lab, visited_positions, args.output)
+            else:
+                render_loops(lab, loop_positions, args.output)
+        elif args.display:
             if len(loop_positions) == 0:
                 plot_positions(visited_positions, rows, cols)
             else:
@@ -6,84 +6,570 @@ expressions with various operators and checking their solvability.
 """
 
 import argparse
-from itertools import product
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
 
-import pandas as pd
+import numpy as np
 from tqdm import tqdm
 
+from checkpoint import read_appended
+from checkpoint import save_checkpoint
+from ragged import parse_ragged
+from ragged import split_targets
 
-def evaluate_expression(operands, operators):
-    """Evaluate an expression using the given operands and operators.
+
+def concat_power(operand):
+    """Return the power of ten that ``operand`` is shifted by when concatenated.
 
     Args:
-        operands (list): List of integers representing operands.
-        operators (list): List of operators as strings ('+', '*', '|').
+        operand (int): A non-negative integer.
 
     Returns:
-        int: The result of the evaluated expression.
+        int: ``10 ** digits(operand)``, so that ``a | b == a * power + b``.
     """
-    result = operands[0]
-    for i in range(len(operators)):
-        if operators[i] == "+":
-            result += operands[i + 1]
-        elif operators[i] == "*":
-            result *= operands[i + 1]
-        elif operators[i] == "|":
-            result = int(str(result) + str(operands[i + 1]))
-    return result
+    power = 10
+    while power <= operand:
+        power *= 10
+    return power
+
 
+def solve_backwards(test_value, operands, operator_set="+*|", powers=None):
+    """Check if the operands can produce the test value, working backwards.
 
-def check_solvability(row, operator_set="+*|"):
-    """Check if the expression represented by the row can be solved.
+    The last operand is peeled off the target using the inverse of each
+    operator: subtraction for ``+``, exact division for ``*`` and stripping
+    a matching decimal suffix for ``|``. Branches whose inverse is not
+    possible are pruned immediately.
 
     Args:
-        row (pd.Series): A row of the DataFrame containing test value and operands.
+        test_value (int): The value the expression must produce.
+        operands (list): List of non-negative integers.
         operator_set (str): String of operators to use for evaluation.
+        powers (list): Concatenation powers of the operands from
+            ``concat_power``, computed if not given.
 
     Returns:
-        bool: True if the expression can be solved, False otherwise.
+        bool: True if some choice of operators produces the test value.
     """
-    test_value = row["test_value"]
-    operands = row.dropna().values[1:]  # Skip test value and drop NaN
-    num_operators = len(operands) - 1
-    operator_combinations = product(operator_set, repeat=num_operators)
-    for operators in operator_combinations:
-        if evaluate_expression(operands, operators) == test_value:
-            return True
-    return False
+    if powers is None:
+        powers = [concat_power(operand) for operand in operands]
+    use_add = "+" in operator_set
+    use_mul = "*" in operator_set
+    use_cat = "|" in operator_set
 
+    def solve(target, n):
+        """Check if the first ``n`` operands can produce ``target``."""
+        last = operands[n - 1]
+        if n == 1:
+            return target == last
 
-def solve_calibration_problem(in_file, operator_set="+*|"):
-    """Solve the calibration problem by checking expression solvability.
+        if use_add and target >= last:
+            if solve(target - last, n - 1):
+                return True
+        if use_mul:
+            if last == 0:
+                # Anything times zero is zero
+                if target == 0:
+                    return True
+            elif target % last == 0:
+                if solve(target // last, n - 1):
+                    return True
+        if use_cat:
+            power = powers[n - 1]
+            if target % power == last:
+                if solve(target // power, n - 1):
+                    return True
+        return False
+
+    return test_value >= 0 and len(operands) > 0 and solve(test_value, len(operands))
+
+
+def count_solutions(test_value, operands, operator_set="+*|", powers=None):
+    """Count the operator assignments that produce the test value.
+
+    Partial results are expanded level by level, one operand at a time, so
+    each shared prefix is evaluated once and equal partial values are merged
+    with their counts. None of the operators decreases a partial value
+    unless an operand is zero, so partial values above the test value are
+    dropped whenever no zero operand remains.
+
+    Args:
+        test_value (int): The value the expression must produce.
+        operands (list): List of non-negative integers.
+        operator_set (str): String of operators to use for evaluation.
+        powers (list): Concatenation powers of the operands from
+            ``concat_power``, computed if not given.
+
+    Returns:
+        int: The number of operator assignments producing the test value.
+    """
+    if powers is None:
+        powers = [concat_power(operand) for operand in operands]
+    if not operands:
+        return 0
+
+    # zero_after[i] is True if any operand after position i is zero
+    zero_after = [False] * len(operands)
+    for i in range(len(operands) - 2, -1, -1):
+        zero_after[i] = zero_after[i + 1] or operands[i + 1] == 0
+
+    partials = Counter({operands[0]: 1})
+    for i in range(1, len(operands)):
+        operand = operands[i]
+        power = powers[i]
+        prune = not zero_after[i]
+        next_partials = Counter()
+        for value, count in partials.items():
+            for operator in operator_set:
+                if operator == "+":
+                    result = value + operand
+                elif operator == "*":
+                    result = value * operand
+                else:
+                    result = value * power + operand
+                if prune and result > test_value:
+                    continue
+                next_partials[result] += count
+        partials = next_partials
+    return partials[test_value]
+
+
+def check_solvability(test_value, operands, operator_set="+*|", count=False):
+    """Check if the expression for one equation can be solved.
+
+    Args:
+        test_value (int): The value the expression must produce.
+        operands (list): List of non-negative integers.
+        operator_set (str): String of operators to use for evaluation.
+        count (bool): Count the valid operator assignments instead.
+
+    Returns:
+        bool: True if the expression can be solved, False otherwise,
+            or the number of valid operator assignments if ``count``.
+    """
+    powers = [concat_power(operand) for operand in operands]
+    if count:
+        return count_solutions(test_value, operands, operator_set, powers)
+    return solve_backwards(test_value, operands, operator_set, powers)
+
+
+def parse_equations(data):
+    """Parse equations into test values and CSR operands.
+
+    Raises:
+        ValueError: If a non-blank line is not a test value, a ``:`` and
+            its operands.
+
+    Args:
+        data (bytes): Lines of ``test_value: operands``.
+
+    Returns:
+        tuple: The test values, and the operands as CSR values and row
+            offsets (see ``ragged``).
+    """
+    malformed = re.search(rb"(?m)^(?![ \t\r]*$)(?![ \t]*-?\d+:[^:\n]*$).*$", data)
+    if malformed:
+        raise ValueError(f"malformed equation: {malformed.group().decode()!r}")
+    return split_targets(*parse_ragged(data, b":"))
+
+
+def load_equations(in_file):
+    """Load the equations from the input file.
 
     Args:
         in_file (str): Path to the input file containing test values and operands.
+
+    Returns:
+        tuple: The test values and CSR operands from ``parse_equations``.
+    """
+    with open(in_file, "rb") as file:
+        return parse_equations(file.read())
+
+
+def iter_equations(equations):
+    """Yield each equation as a test value and a list of operands.
+
+    Args:
+        equations (tuple): Test values and CSR operands from ``load_equations``.
+
+    Yields:
+        tuple: The test value and the list of operands of the next row.
+    """
+    targets, values, row_offsets = equations
+    for i in range(len(targets)):
+        yield int(targets[i]), values[row_offsets[i] : row_offsets[i + 1]].tolist()
+
+
+def select_equations(equations, rows):
+    """Select a subset of rows from CSR equations.
+
+    Args:
+        equations (tuple): Test values and CSR operands from ``load_equations``.
+        rows (np.ndarray): Indices of the rows to keep.
+
+    Returns:
+        tuple: The selected test values and their CSR operands.
+    """
+    targets, values, row_offsets = equations
+    lengths = np.diff(row_offsets)[rows]
+    new_offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    shift = np.repeat(row_offsets[:-1][rows] - new_offsets[:-1], lengths)
+    return targets[rows], values[shift + np.arange(new_offsets[-1])], new_offsets
+
+
+def calibration_sum(targets, valid):
+    """Sum the test values of the valid rows exactly.
+
+    Args:
+        targets (np.ndarray): Test values.
+        valid (np.ndarray): Boolean array of the solvable rows.
+
+    Returns:
+        int: The sum of the test values of the solvable rows.
+    """
+    return sum(int(value) for value in targets[np.asarray(valid, dtype=bool)])
+
+
+# Operands from here on have concatenation powers that overflow int64
+OPERAND_LIMIT = 10**18
+
+# Rows solved together by the batched engine, bounding its peak memory
+CHUNK_ROWS = 65536
+
+
+def concat_powers(operands):
+    """Vectorized ``concat_power`` over an array of operands.
+
+    Args:
+        operands (np.ndarray): int64 array of non-negative integers below
+            ``OPERAND_LIMIT``, whose powers still fit in int64.
+
+    Returns:
+        np.ndarray: ``10 ** digits`` of every operand.
+
+    Raises:
+        ValueError: If an operand's power would overflow int64.
+    """
+    if operands.size > 0 and operands.max() >= OPERAND_LIMIT:
+        raise ValueError("operands of 10**18 or more overflow int64 powers")
+    powers = np.full_like(operands, 10)
+    while True:
+        short = powers <= operands
+        if not short.any():
+            return powers
+        powers[short] *= 10
+
+
+def solve_group(targets, operands, operator_set="+*|"):
+    """Solve a group of equations with the same operand count in bulk.
+
+    This is ``solve_backwards`` run level by level across every row at
+    once: the remaining targets of all rows are int64 arrays, each tagged
+    with its row, and the last unused operand is peeled off all of them
+    with the inverse of each operator. Infeasible branches are dropped and
+    duplicate ``(row, remaining)`` pairs merged after every level. Values
+    only shrink going backwards, so nothing can overflow. Operands must be
+    positive and below ``OPERAND_LIMIT``.
+
+    Args:
+        targets (np.ndarray): ``(m,)`` int64 array of test values.
+        operands (np.ndarray): ``(m, n)`` int64 array of operands.
+        operator_set (str): String of operators to use for evaluation.
+
+    Returns:
+        np.ndarray: ``(m,)`` boolean array, True where a row is solvable.
+    """
+    powers = concat_powers(operands)
+
+    rows = np.arange(len(targets))
+    remaining = targets.copy()
+
+    for j in range(operands.shape[1] - 1, 0, -1):
+        operand = operands[rows, j]
+        next_rows = []
+        next_remaining = []
+        # Every prefix of positive operands is at least 1
+        if "+" in operator_set:
+            ok = remaining > operand
+            next_rows.append(rows[ok])
+            next_remaining.append(remaining[ok] - operand[ok])
+        if "*" in operator_set:
+            ok = remaining % operand == 0
+            next_rows.append(rows[ok])
+            next_remaining.append(remaining[ok] // operand[ok])
+        if "|" in operator_set:
+            power = powers[rows, j]
+            ok = (remaining % power == operand) & (remaining >= power)
+            next_rows.append(rows[ok])
+            next_remaining.append(remaining[ok] // power[ok])
+        rows = np.concatenate(next_rows)
+        remaining = np.concatenate(next_remaining)
+
+        # Merge branches that reached the same remaining target
+        order = np.lexsort((remaining, rows))
+        rows, remaining = rows[order], remaining[order]
+        distinct = np.ones(len(rows), dtype=bool)
+        distinct[1:] = (rows[1:] != rows[:-1]) | (remaining[1:] != remaining[:-1])
+        rows, remaining = rows[distinct], remaining[distinct]
+
+    valid = np.zeros(len(targets), dtype=bool)
+    valid[rows[remaining == operands[rows, 0]]] = True
+    return valid
+
+
+def solve_batched(equations, operator_set="+*|"):
+    """Solve every equation, batching rows by operand count.
+
+    Rows whose target does not fit in int64, whose operands reach
+    ``OPERAND_LIMIT``, or that contain a zero operand (which would defeat
+    the pruning) fall back to the exact Python solver. The backward search
+    only shrinks the target, so no other row can overflow. Each group is
+    solved in chunks of at most ``CHUNK_ROWS`` rows.
+
+    Args:
+        equations (tuple): Test values and CSR operands from ``load_equations``.
+        operator_set (str): String of operators to use for evaluation.
+
+    Returns:
+        np.ndarray: Boolean array, True where a row is solvable.
+    """
+    targets, values, row_offsets = equations
+    lengths = np.diff(row_offsets)
+    valid = np.zeros(len(targets), dtype=bool)
+    if len(values) == 0:
+        return valid
+
+    # Per-row largest and smallest operand, estimated in float64 so that
+    # values too large for int64 are flagged rather than wrapped
+    present = lengths > 0
+    starts = row_offsets[:-1][present]
+    estimates = values.astype(np.float64)
+    max_operand = np.zeros(len(targets))
+    min_operand = np.zeros(len(targets))
+    max_operand[present] = np.maximum.reduceat(estimates, starts)
+    min_operand[present] = np.minimum.reduceat(estimates, starts)
+
+    # Only a reader that kept Python ints can hold targets beyond int64
+    wide = np.zeros(len(targets), dtype=bool)
+    if targets.dtype == object:
+        limits = np.iinfo(np.int64)
+        wide[:] = [not limits.min <= t <= limits.max for t in targets.tolist()]
+    exact = present & (wide | (min_operand == 0) | (max_operand >= OPERAND_LIMIT))
+    for i in np.flatnonzero(exact):
+        operands = values[row_offsets[i] : row_offsets[i + 1]].tolist()
+        valid[i] = solve_backwards(int(targets[i]), operands, operator_set)
+
+    batched = present & ~exact
+    for n in np.unique(lengths[batched]):
+        group = np.flatnonzero(batched & (lengths == n))
+        for start in range(0, len(group), CHUNK_ROWS):
+            rows = group[start : start + CHUNK_ROWS]
+            operands = values[row_offsets[rows][:, None] + np.arange(n)]
+            valid[rows] = solve_group(
+                targets[rows].astype(np.int64),
+                operands.astype(np.int64),
+                operator_set,
+            )
+    return valid
+
+
+def solve_chunk(equations, operator_set="+*|", batched=False):
+    """Solve a chunk of equations and return their partial calibration sum.
+
+    Args:
+        equations (tuple): Test values and CSR operands from ``load_equations``.
         operator_set (str): String of operators to use for evaluation.
+        batched (bool): Solve the chunk with the batched NumPy engine.
+
+    Returns:
+        int: The sum of the test values of the solvable rows.
     """
-    data = []
-    with open(in_file) as file:
-        for line in file:
-            parts = line.strip().split(":")
-            if len(parts) == 2:
-                key = int(parts[0])  # Convert key to integer
-                values = list(map(int, parts[1].strip().split()))
-                data.append([key] + values)
-
-    # Create DataFrame
-    df = pd.DataFrame(data)
-    df.columns = ["test_value"] + [f"operand_{i}" for i in range(df.shape[1] - 1)]
-
-    # Apply the function to each row with a progress bar
-    tqdm.pandas(desc="Processing rows")
-    df["valid"] = df.progress_apply(
-        lambda row: check_solvability(row, operator_set), axis=1
+    if batched:
+        valid = solve_batched(equations, operator_set)
+    else:
+        valid = [
+            check_solvability(test_value, operands, operator_set)
+            for test_value, operands in iter_equations(equations)
+        ]
+    return calibration_sum(equations[0], valid)
+
+
+def solve_chunk_both(equations, batched=False):
+    """Solve a chunk of equations for both parts in one pass.
+
+    Every row is first solved with ``+*``. Since any row valid without
+    concatenation is also valid with it, only the rows that failed are
+    searched again with ``+*|``.
+
+    Args:
+        equations (tuple): Test values and CSR operands from ``load_equations``.
+        batched (bool): Solve the chunk with the batched NumPy engine.
+
+    Returns:
+        tuple: The partial calibration sums for part 1 and part 2.
+    """
+    if batched:
+        valid = solve_batched(equations, "+*")
+        cal_one = calibration_sum(equations[0], valid)
+        failed = select_equations(equations, np.flatnonzero(~valid))
+        return cal_one, cal_one + solve_chunk(failed, "+*|", batched)
+
+    # Concatenation powers are computed once per row and shared by both parts
+    rows = list(iter_equations(equations))
+    powers = [[concat_power(operand) for operand in operands] for _, operands in rows]
+    valid_one = [
+        solve_backwards(test_value, operands, "+*", row_powers)
+        for (test_value, operands), row_powers in zip(rows, powers)
+    ]
+    valid_two = [
+        valid or solve_backwards(test_value, operands, "+*|", row_powers)
+        for valid, (test_value, operands), row_powers in zip(valid_one, rows, powers)
+    ]
+    return (
+        calibration_sum(equations[0], valid_one),
+        calibration_sum(equations[0], valid_two),
     )
 
-    # Filter valid rows
-    valid_df = df[df["valid"]]
+
+def solve_parallel(equations, operator_set="+*|", workers=2, batched=False, both=False):
+    """Solve equations across a pool of processes.
+
+    Rows are sent to the workers in chunks and the progress bar advances
+    once per finished chunk rather than once per row.
+
+    Args:
+        equations (tuple): Test values and CSR operands from ``load_equations``.
+        operator_set (str): String of operators to use for evaluation.
+        workers (int): Number of worker processes.
+        batched (bool): Solve each chunk with the batched NumPy engine.
+        both (bool): Solve both parts with ``solve_chunk_both``.
+
+    Returns:
+        int: The sum of the test values of the solvable rows, or a tuple
+            of the sums for both parts if ``both``.
+    """
+    n_rows = len(equations[0])
+    # Several chunks per worker keeps the pool balanced and the bar moving
+    chunk_size = max(n_rows // (workers * 16), 1)
+    chunks = [
+        select_equations(equations, np.arange(i, min(i + chunk_size, n_rows)))
+        for i in range(0, n_rows, chunk_size)
+    ]
+
+    cal = (0, 0) if both else 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        if both:
+            futures = {
+                pool.submit(solve_chunk_both, chunk, batched): len(chunk[0])
+                for chunk in chunks
+            }
+        else:
+            futures = {
+                pool.submit(solve_chunk, chunk, operator_set, batched): len(chunk[0])
+                for chunk in chunks
+            }
+        with tqdm(total=n_rows, desc="Processing rows") as progress:
+            for future in as_completed(futures):
+                if both:
+                    cal_one, cal_two = future.result()
+                    cal = (cal[0] + cal_one, cal[1] + cal_two)
+                else:
+                    cal += future.result()
+                progress.update(futures[future])
+    return cal
+
+
+def solve_both_parts(in_file, batched=False, workers=1):
+    """Solve part 1 and part 2 from a single parse and pass over the rows.
+
+    Args:
+        in_file (str): Path to the input file containing test values and operands.
+        batched (bool): Solve the rows with the batched NumPy engine.
+        workers (int): Number of processes to solve rows with.
+    """
+    equations = load_equations(in_file)
+    if workers > 1:
+        cal_one, cal_two = solve_parallel(
+            equations, workers=workers, batched=batched, both=True
+        )
+    else:
+        cal_one, cal_two = solve_chunk_both(equations, batched)
+    print(f"Calibration reports (part 1): {cal_one}")
+    print(f"Calibration reports (part 2): {cal_two}")
+
+
+def solve_incremental(in_file, batched=False):
+    """Solve both parts from a checkpoint plus newly appended equations.
+
+    Rows are independent, so only the appended equations are solved and
+    their calibration sums added to the running totals in the checkpoint.
+
+    Args:
+        in_file (str): Path to the input file containing test values and operands.
+        batched (bool): Solve the new rows with the batched NumPy engine.
+    """
+    state, data, offset = read_appended(in_file, "day-7")
+    if state is None:
+        state = {"part_1": 0, "part_2": 0}
+
+    equations = parse_equations(data)
+    cal_one, cal_two = solve_chunk_both(equations, batched)
+    state["part_1"] += cal_one
+    state["part_2"] += cal_two
+
+    save_checkpoint(in_file, "day-7", offset, state)
+    print(f"Calibration reports (part 1): {state['part_1']}")
+    print(f"Calibration reports (part 2): {state['part_2']}")
+
+
+def solve_calibration_problem(
+    in_file, operator_set="+*|", count=False, batched=False, workers=1
+):
+    """Solve the calibration problem by checking expression solvability.
+
+    Args:
+        in_file (str): Path to the input file containing test values and operands.
+        operator_set (str): String of operators to use for evaluation.
+        count (bool): Also report the number of valid operator assignments.
+        batched (bool): Solve all rows with the batched NumPy engine.
+        workers (int): Number of processes to solve rows with.
+    """
+    equations = load_equations(in_file)
+    targets = equations[0]
+
+    if workers > 1 and not count:
+        cal = solve_parallel(equations, operator_set, workers, batched)
+        print(f"Calibration reports: {cal}")
+        return
+
+    if batched and not count:
+        valid = solve_batched(equations, operator_set)
+        cal = calibration_sum(targets, valid)
+        print(f"Calibration reports: {cal}")
+        return
+
+    # Check each row with a progress bar
+    valid = np.zeros(len(targets), dtype=bool)
+    solutions = 0
+    rows = tqdm(iter_equations(equations), total=len(targets), desc="Processing rows")
+    for i, (test_value, operands) in enumerate(rows):
+        if count:
+            row_solutions = check_solvability(
+                test_value, operands, operator_set, count=True
+            )
+            solutions += row_solutions
+            valid[i] = row_solutions > 0
+        else:
+            valid[i] = check_solvability(test_value, operands, operator_set)
+
+    if count:
+        print(f"Valid operator assignments: {solutions}")
 
     # Count the sum of test values in valid rows
-    cal = valid_df["test_value"].sum()
+    cal = calibration_sum(targets, valid)
     print(f"Calibration reports: {cal}")
 
 
@@ -96,10 +582,53 @@ def main():
     parser.add_argument(
         "--part", type=int, default=1, help="Puzzle part: 1 or 2 (default=1)"
     )
+    parser.add_argument(
+        "--count",
+        action="store_true",
+        help="Also count the valid operator assignments",
+    )
+    parser.add_argument(
+        "--batched",
+        action="store_true",
+        help="Solve rows in bulk with NumPy, faster on large inputs",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of processes to solve rows with (default=1)",
+    )
+    parser.add_argument(
+        "--both",
+        action="store_true",
+        help="Solve both parts in one pass, reusing the part 1 results",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Solve both parts, processing only lines appended since the last run",
+    )
     args = parser.parse_args()
+    if args.workers > 1 and args.count:
+        parser.error("--workers cannot be combined with --count")
+    if args.workers > 1 and args.incremental:
+        parser.error("--workers cannot be combined with --incremental")
+    for flag in ("both", "incremental", "batched"):
+        if args.count and getattr(args, flag):
+            parser.error(f"--count cannot be combined with --{flag}")
+
+    if args.incremental:
+        solve_incremental(args.input_path, args.batched)
+        return
+
+    if args.both:
+        solve_both_parts(args.input_path, args.batched, args.workers)
+        return
 
     operator_set = "+*" if args.part == 1 else "+*|"
-    solve_calibration_problem(args.input_path, operator_set)
+    solve_calibration_problem(
+        args.input_path, operator_set, args.count, args.batched, args.workers
+    )
 
 
 if __name__ == "__main__":
@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+
+"""Shared reader for files of variable-length integer rows.
+
+Several days store one row of integers per line, with rows of different
+lengths. Rather than padding the rows into a table, the whole file is
+tokenized in bulk into a CSR-style pair of numpy arrays: ``values`` holds
+every integer in order and ``row_offsets`` holds where each row starts, so
+row ``i`` is ``values[row_offsets[i] : row_offsets[i + 1]]``.
+
+Functions:
+    parse_ragged: Tokenizes bytes into CSR values and row offsets.
+    parse_exact: Parses tokens into exact Python ints.
+    read_ragged: Reads and tokenizes a file into CSR values and row offsets.
+    split_targets: Splits the leading value of each row into its own array.
+"""
+
+import numpy as np
+
+
+def parse_ragged(data, separators=b""):
+    """Tokenize rows of integers into CSR values and row offsets.
+
+    Tokens are separated by whitespace and any of ``separators``; rows are
+    separated by newlines. Blank lines do not produce rows. Values are
+    int64 unless a token does not fit, in which case every value is parsed
+    exactly into an object array of Python ints.
+
+    Raises:
+        ValueError: If a token is not an integer, such as a lone ``-``.
+
+    Args:
+        data (bytes): The text to tokenize.
+        separators (bytes): Extra characters that separate tokens.
+
+    Returns:
+        tuple: An int64 (or object) array of every value and an int64
+            array of ``rows + 1`` offsets into it.
+    """
+    if separators:
+        data = data.translate(bytes.maketrans(separators, b" " * len(separators)))
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    in_token = ((buf >= ord("0")) & (buf <= ord("9"))) | (buf == ord("-"))
+    starts = np.flatnonzero(in_token & ~np.concatenate([[False], in_token[:-1]]))
+    ends = np.flatnonzero(in_token & ~np.concatenate([in_token[1:], [False]]))
+
+    # A minus sign may only lead a token that has digits after it
+    minus = np.flatnonzero(buf == ord("-"))
+    if not np.isin(minus, starts).all() or np.isin(minus, ends).any():
+        raise ValueError("malformed integer token")
+
+    # Line number of every token start, then tokens per non-blank line
+    newlines = np.flatnonzero(buf == ord("\n"))
+    lines = np.searchsorted(newlines, starts)
+    counts = np.bincount(lines)
+    counts = counts[counts > 0]
+
+    # The largest int64 has 19 digits, so only longer tokens may not fit
+    digits = ends - starts + 1 - (buf[starts] == ord("-"))
+    if len(starts) == 0:
+        values = np.zeros(0, dtype=np.int64)
+    elif digits.max() >= 19:
+        values = parse_exact(data)
+    else:
+        values = np.fromstring(data.decode(), dtype=np.int64, sep=" ")
+    if len(values) != len(starts):
+        raise ValueError(f"parsed {len(values)} values from {len(starts)} tokens")
+    row_offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=row_offsets[1:])
+    return values, row_offsets
+
+
+def parse_exact(data):
+    """Parse every token into a Python int, without int64 clamping.
+
+    Args:
+        data (bytes): Whitespace separated tokens.
+
+    Returns:
+        np.ndarray: An int64 array if every value fits, else an object array.
+    """
+    values = [int(token) for token in data.split()]
+    limits = np.iinfo(np.int64)
+    if all(limits.min <= value <= limits.max for value in values):
+        return np.array(values, dtype=np.int64)
+    return np.array(values, dtype=object)
+
+
+def read_ragged(in_file, separators=b""):
+    """Read a file of integer rows into CSR values and row offsets.
+
+    Args:
+        in_file (str): Path to the input file.
+        separators (bytes): Extra characters that separate tokens.
+
+    Returns:
+        tuple: The ``values`` and ``row_offsets`` arrays from ``parse_ragged``.
+    """
+    with open(in_file, "rb") as file:
+        return parse_ragged(file.read(), separators)
+
+
+def split_targets(values, row_offsets):
+    """Split the leading value of each row into its own array.
+
+    Args:
+        values (np.ndarray): CSR values.
+        row_offsets (np.ndarray): CSR row offsets.
+
+    Returns:
+        tuple: The leading value of each row, and the CSR values and row
+            offsets of the remaining columns.
+    """
+    targets = values[row_offsets[:-1]]
+    keep = np.ones(len(values), dtype=bool)
+    keep[row_offsets[:-1]] = False
+    return (
+        targets,
+        values[keep],
+        row_offsets - np.arange(len(row_offsets), dtype=np.int64),
+    )